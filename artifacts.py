@@ -0,0 +1,209 @@
+"""
+Output Artifacts and Manifest
+
+Writes rendered device configs to output/ and records them in
+output/manifest.json so pushers and diff tools can go straight to one
+device's config without globbing or scanning every file.
+
+Formats:
+    files  - Current layout: output/panorama-set.txt (panorama) or
+             output/<device>.txt (standalone). For the single Panorama file the
+             manifest records each device's byte offset and length.
+    shards - One file per device (= per template in Panorama mode) under
+             output/shards/, optionally gzip or zstd compressed.
+
+Manifest entry per device: path (relative to output/), sha256 and line/byte
+counts of the uncompressed config, and stored_bytes on disk.
+"""
+
+import os
+import gzip
+import json
+import hashlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+MANIFEST = "manifest.json"
+SHARD_DIR = "shards"
+EXTENSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def compress(data, compression):
+    if compression == "none":
+        return data
+    if compression == "gzip":
+        # Fixed mtime keeps output reproducible
+        return gzip.compress(data, mtime=0)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package")
+        return zstandard.ZstdCompressor().compress(data)
+    raise ValueError(f"Unknown compression '{compression}' (expected none, gzip or zstd)")
+
+
+def decompress(data, compression):
+    if compression == "none":
+        return data
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown compression '{compression}'")
+
+
+def describe(text):
+    """sha256, line count and byte size of a rendered config"""
+    data = text.encode()
+    return {
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "lines": text.count("\n") + (1 if text and not text.endswith("\n") else 0),
+        "bytes": len(data),
+    }
+
+
+def load_manifest(outdir="output", target=None):
+    """
+    Return the manifest dict, or None if output/ has no manifest. With target
+    set, a manifest built for another target is ignored (returns None).
+    """
+    path = os.path.join(outdir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    if target and manifest.get("target") != target:
+        print(f"Ignoring {path}: built for target '{manifest.get('target')}', not '{target}'")
+        return None
+    return manifest
+
+
+def read_config(device, manifest, outdir="output"):
+    """
+    Read one device's rendered config using the manifest.
+
+    Raises ValueError if the content no longer matches the manifest's sha256
+    (output file edited or rebuilt without updating the manifest).
+    """
+    entry = manifest["devices"][device]
+    path = os.path.join(outdir, entry["path"])
+    with open(path, "rb") as f:
+        if "offset" in entry:
+            f.seek(entry["offset"])
+            data = f.read(entry["length"])
+        else:
+            data = decompress(f.read(), entry.get("compression", "none"))
+    if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+        raise ValueError(f"{path} does not match {os.path.join(outdir, MANIFEST)} for {device}; "
+                         f"re-run build-config.py")
+    return data.decode()
+
+
+def _unchanged(entry, outdir, data):
+    """True if the file on disk already holds this content (compressed shards are decompressed)"""
+    full_path = os.path.join(outdir, entry["path"])
+    if not os.path.exists(full_path):
+        return False
+    with open(full_path, "rb") as f:
+        stored = f.read()
+    try:
+        return decompress(stored, entry["compression"]) == data
+    except Exception:
+        # Corrupt or truncated shard: rewrite it
+        return False
+
+
+def write_outputs(rendered, target, output_format="files", compression="none", outdir="output"):
+    """
+    Write rendered configs and the manifest.
+
+    Args:
+        rendered: Dictionary of device name -> rendered config text
+        target: "panorama" or "standalone"
+        output_format: "files" or "shards"
+        compression: "none", "gzip" or "zstd" (shards only)
+
+    Returns:
+        list: Paths written (unchanged shards and files are skipped)
+    """
+    if output_format not in ("files", "shards"):
+        raise ValueError(f"Unknown output format '{output_format}' (expected files or shards)")
+    if output_format == "files":
+        compression = "none"
+    elif compression not in EXTENSIONS:
+        raise ValueError(f"Unknown compression '{compression}' (expected none, gzip or zstd)")
+    elif compression == "zstd" and zstandard is None:
+        raise ValueError("zstd compression requires the 'zstandard' package")
+
+    previous = load_manifest(outdir)
+    manifest = {
+        "target": target,
+        "format": output_format,
+        "compression": compression,
+        "devices": {},
+    }
+    written = []
+
+    if output_format == "files" and target == "panorama":
+        path = "panorama-set.txt"
+        chunks = []
+        offset = 0
+        for name, text in rendered.items():
+            header = f"# ===== Configuration for {name} =====\n".encode()
+            if chunks:
+                header = b"\n\n" + header
+            data = text.encode()
+            entry = {"path": path, "compression": "none", **describe(text)}
+            entry.update({"offset": offset + len(header), "length": len(data), "stored_bytes": len(data)})
+            manifest["devices"][name] = entry
+            chunks.extend([header, data])
+            offset += len(header) + len(data)
+
+        content = b"".join(chunks)
+        full_path = os.path.join(outdir, path)
+        existing = None
+        if os.path.exists(full_path):
+            with open(full_path, "rb") as f:
+                existing = f.read()
+        if existing != content:
+            with open(full_path, "wb") as f:
+                f.write(content)
+            written.append(full_path)
+    else:
+        if output_format == "shards":
+            os.makedirs(os.path.join(outdir, SHARD_DIR), exist_ok=True)
+        for name, text in rendered.items():
+            if output_format == "shards":
+                path = f"{SHARD_DIR}/{name}.txt{EXTENSIONS[compression]}"
+            else:
+                path = f"{name}.txt"
+            entry = {"path": path, "compression": compression, **describe(text)}
+            full_path = os.path.join(outdir, path)
+            if _unchanged(entry, outdir, text.encode()):
+                entry["stored_bytes"] = os.path.getsize(full_path)
+            else:
+                data = compress(text.encode(), compression)
+                with open(full_path, "wb") as f:
+                    f.write(data)
+                entry["stored_bytes"] = len(data)
+                written.append(full_path)
+            manifest["devices"][name] = entry
+
+    # Remove shards that the previous manifest listed but this one does not
+    current = {e["path"] for e in manifest["devices"].values()}
+    for entry in (previous or {}).get("devices", {}).values():
+        path = entry.get("path", "")
+        if path.startswith(f"{SHARD_DIR}/") and path not in current:
+            full_path = os.path.join(outdir, path)
+            if os.path.exists(full_path):
+                os.remove(full_path)
+
+    with open(os.path.join(outdir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    return written
@@ -16,6 +16,8 @@ import glob
 from netmiko import ConnectHandler
 from getpass import getpass
 
+from artifacts import write_outputs, load_manifest, read_config
+
 
 with open("model-sdwan.yaml", "r") as f:
     model = yaml.safe_load(f)
@@ -23,6 +25,15 @@ with open("model-sdwan.yaml", "r") as f:
 # Get output target from model (default to panorama)
 OUTPUT_TARGET = model.get("target", "panorama")
 
+# Push transport for Panorama: "ssh" (Netmiko, line by line) or "api" (XML API bulk load)
+PUSH_CONFIG = model.get("push", {}) or {}
+PUSH_METHOD = PUSH_CONFIG.get("method", "ssh")
+
+# Output layout: "files" (panorama-set.txt / <device>.txt) or "shards", plus compression
+OUTPUT_CONFIG = model.get("output", {}) or {}
+OUTPUT_FORMAT = OUTPUT_CONFIG.get("format", "files")
+OUTPUT_COMPRESSION = OUTPUT_CONFIG.get("compression", "none")
+
 
 def get_wan_interfaces(member_data):
     """
@@ -106,10 +117,65 @@ def generate_tunnel_mesh(model):
     return tunnels
 
 
-def build_device_models(model):
+def build_wan_tables(members):
+    """
+    Precompute per-member WAN routing data, once per member.
+
+    Returns dict keyed by member name:
+        l3_subnets: {intf_key: network} for L3 WAN interfaces (l3: True)
+        egress: {intf_key: {"intf": name, "gw": sdwan_gw, "version": 4 or 6}} for interfaces with a gateway
+    """
+    tables = {}
+    for name, member_data in members.items():
+        l3_subnets = {}
+        egress = {}
+        for k, v in member_data.get("interfaces", {}).items():
+            if not isinstance(v, dict):
+                continue
+            if v.get("l3") and "address" in v:
+                l3_subnets[k] = ipaddress.ip_interface(v["address"]).network
+            if "name" in v and "sdwan_gw" in v:
+                egress[k] = {"intf": v["name"], "gw": v["sdwan_gw"],
+                             "version": ipaddress.ip_address(v["sdwan_gw"]).version}
+        tables[name] = {"l3_subnets": l3_subnets, "egress": egress}
+    return tables
+
+
+def aggregate_routes(routes):
+    """
+    Collapse contiguous subnets that share the same next hop.
+
+    Args:
+        routes: Iterable of (network, {"intf": ..., "gw": ...}) pairs
+
+    Returns:
+        dict: Subnet string -> next hop, grouped by next hop
+    """
+    by_next_hop = {}
+    for network, nh in routes:
+        key = (nh["intf"], nh["gw"], network.version)
+        by_next_hop.setdefault(key, []).append(network)
+
+    aggregated = {}
+    for (intf, gw, _), networks in by_next_hop.items():
+        for network in ipaddress.collapse_addresses(networks):
+            aggregated[str(network)] = {"intf": intf, "gw": gw}
+    return aggregated
+
+
+def route_name(prefix, subnet):
+    """PAN-OS object name for a subnet route (no '/' or ':', so IPv6 works too)"""
+    return f"{prefix}_{subnet.replace('/', '_').replace(':', '-')}"
+
+
+def build_device_models(model, tunnel_mesh=None):
     """
     Build device-specific models from the topology definition.
 
+    Args:
+        model: Topology model loaded from model-sdwan.yaml
+        tunnel_mesh: Precomputed generate_tunnel_mesh() output (generated if omitted)
+
     Returns:
         dict: Dictionary of device models keyed by device name
     """
@@ -117,7 +183,19 @@ def build_device_models(model):
     device_models = {}
 
     # Generate the full tunnel mesh
-    tunnel_mesh = generate_tunnel_mesh(model)
+    if tunnel_mesh is None:
+        tunnel_mesh = generate_tunnel_mesh(model)
+
+    # Index tunnels by (hub, spoke) so each member/remote pair is a lookup
+    tunnels_by_pair = {}
+    for tunnel_key, tunnel_data in tunnel_mesh.items():
+        tunnels_by_pair.setdefault(tunnel_key[:2], []).append((tunnel_key, tunnel_data))
+
+    # WAN subnets and egress interfaces, computed once per member
+    wan_tables = build_wan_tables(members)
+
+    # Optional static routes to remote L3 WAN subnets (routes.remote_wans in the model)
+    remote_wan_routes = bool((model.get("routes") or {}).get("remote_wans", False))
 
     for m in members:
         member_data = members[m]
@@ -155,28 +233,28 @@ def build_device_models(model):
 
         # Build remote device objects with tunnels
         remotes = {}
+        local_egress = wan_tables[m]["egress"]
+        all_wan_routes = []
         for r in remote_sites:
             remote_data = members[r]
             sdwan_intf = int(remote_data["id"]) + 100
             loopback = remote_data["router_id"]
 
-            # Build static routes for L3 remote WANs
-            remote_wans = {}
-            for k, v in remote_data["interfaces"].items():
-                try:
-                    if v.get("l3") and k in member_data["interfaces"]:
-                        subnet = str(ipaddress.ip_interface(v["address"]).network)
-                        local_intf = member_data["interfaces"][k]["name"]
-                        gw = member_data["interfaces"][k]["sdwan_gw"]
-                        remote_wans[subnet] = {"intf": local_intf, "gw": gw}
-                except (KeyError, TypeError):
-                    pass
+            # Static routes for the remote's L3 WANs via the matching local WAN
+            # (same address family only: no IPv6 subnet via an IPv4 gateway)
+            wan_routes = [
+                (subnet, local_egress[k])
+                for k, subnet in wan_tables[r]["l3_subnets"].items()
+                if k in local_egress and local_egress[k]["version"] == subnet.version
+            ]
+            all_wan_routes.extend(wan_routes)
 
             # Build tunnels for this remote
             tunnels = {}
             tunnel_count = 0
+            pair = (m, r) if role == "hub" else (r, m)
 
-            for tunnel_key, tunnel_data in tunnel_mesh.items():
+            for tunnel_key, tunnel_data in tunnels_by_pair.get(pair, []):
                 hub_name, spoke_name, hub_intf_key, spoke_intf_key = tunnel_key
 
                 # Check if this tunnel involves current device (m) and remote (r)
@@ -214,7 +292,6 @@ def build_device_models(model):
                 "id": remote_data["id"],
                 "sdwan_intf": sdwan_intf,
                 "loopback": loopback,
-                "remote_wans": remote_wans,
                 "tunnels": tunnels,
             }
 
@@ -229,6 +306,15 @@ def build_device_models(model):
             "asn": 65000 + member_data["id"],
             "interfaces": member_data["interfaces"],
             "remotes": remotes,
+            # Remote WAN routes across all remotes, aggregated per next hop
+            "remote_wans": remote_wan_routes,
+            # (IPv6 routes go in the ipv6 routing table with an ipv6-address next hop)
+            "wan_routes": [
+                {"name": route_name("wan", subnet), "destination": subnet, **nh,
+                 "table": "ipv6" if ":" in subnet else "ip",
+                 "nexthop": "ipv6-address" if ":" in subnet else "ip-address"}
+                for subnet, nh in aggregate_routes(all_wan_routes).items()
+            ],
             "profiles": model.get("profiles", {}),
         }
 
@@ -237,44 +323,42 @@ def build_device_models(model):
     return device_models
 
 
-def build_config(device_models, target="panorama"):
+def build_config(device_models, target="panorama", output_format="files", compression="none"):
     """
     Build configuration files based on target mode.
 
     Args:
         device_models: Dictionary of device models from build_device_models()
         target: "panorama" for single panorama-set.txt, "standalone" for individual files
+        output_format: "files" (layout above) or "shards" (one file per device in output/shards/)
+        compression: "none", "gzip" or "zstd" for shards
+
+    Writes output/manifest.json indexing each device's config (see artifacts.py).
     """
     file_loader = FileSystemLoader("./")
     env = Environment(loader=file_loader)
 
     if target == "panorama":
         template = env.get_template('pa-set.j2')
-        all_outputs = []
-
-        for name, data in device_models.items():
-            output = template.render(vars=data)
-            all_outputs.append(f"# ===== Configuration for {name} =====\n{output}")
-
-        with open("output/panorama-set.txt", "w") as f:
-            f.write("\n\n".join(all_outputs))
-        print(f"Generated: output/panorama-set.txt")
-
     else:
         template = env.get_template('pa-standalone.j2')
 
-        for name, data in device_models.items():
-            output = template.render(vars=data)
-            with open(f"output/{name}.txt", "w") as f:
-                f.write(output)
-            print(f"Generated: output/{name}.txt")
+    rendered = {name: template.render(vars=data) for name, data in device_models.items()}
+    written = write_outputs(rendered, target, output_format, compression)
 
+    manifest = load_manifest()
+    for path in dict.fromkeys(e["path"] for e in manifest["devices"].values()):
+        status = "" if f"output/{path}" in written else " (unchanged)"
+        print(f"Generated: output/{path}{status}")
+    print("Generated: output/manifest.json")
 
-def print_tunnel_summary(model):
-    """Print a summary of generated tunnels for verification."""
-    tunnel_mesh = generate_tunnel_mesh(model)
 
-    print("\n=== Tunnel Mesh Summary ===")
+def format_tunnel_summary(model, tunnel_mesh=None):
+    """Return a summary of generated tunnels for verification."""
+    if tunnel_mesh is None:
+        tunnel_mesh = generate_tunnel_mesh(model)
+
+    lines = ["\n=== Tunnel Mesh Summary ==="]
 
     # Group by spoke for cleaner output
     by_spoke = {}
@@ -286,20 +370,36 @@ def print_tunnel_summary(model):
 
     for spoke_name in sorted(by_spoke.keys()):
         spoke_id = model["members"][spoke_name]["id"]
-        print(f"\n{spoke_name} (id={spoke_id}, ASN=65{spoke_id:03d}):")
+        lines.append(f"\n{spoke_name} (id={spoke_id}, ASN=65{spoke_id:03d}):")
         for hub_name, hub_intf, spoke_intf, data in by_spoke[spoke_name]:
-            print(f"  {hub_name} {hub_intf} <-> {spoke_name} {spoke_intf}: "
-                  f"{data['hub_tunnel_ip'].split('/')[0]} <-> {data['spoke_tunnel_ip'].split('/')[0]}")
+            lines.append(f"  {hub_name} {hub_intf} <-> {spoke_name} {spoke_intf}: "
+                         f"{data['hub_tunnel_ip'].split('/')[0]} <-> {data['spoke_tunnel_ip'].split('/')[0]}")
+    return "\n".join(lines)
 
 
-def push_config():
-    """Push configuration to Panorama via SSH."""
-    host = input("Enter your hostname: ")
-    password = getpass("Enter password: ")
+def print_tunnel_summary(model):
+    """Print a summary of generated tunnels for verification."""
+    print(format_tunnel_summary(model))
+
+
+def push_config(host=None, password=None, port=22, set_files=None):
+    """
+    Push configuration to Panorama via SSH.
+
+    Prompts for host and password when not given; pass them (and port) to push
+    non-interactively, e.g. to the lab_sim.py fake PAN-OS endpoint. Pushes
+    set_files if given, otherwise every device listed in a Panorama
+    output/manifest.json (falling back to output/*.txt when there is none).
+    """
+    if host is None:
+        host = input("Enter your hostname: ")
+    if password is None:
+        password = getpass("Enter password: ")
 
     device = {
         "device_type": "paloalto_panos",
         "host": host,
+        "port": port,
         "username": "admin",
         "password": password,
         "verbose": True,
@@ -310,7 +410,15 @@ def push_config():
     output = net_connect.send_command("show admins")
     print(output)
 
-    set_files = glob.glob('./output/*.txt')
+    manifest = load_manifest(target="panorama") if set_files is None else None
+    if manifest:
+        for name in manifest["devices"]:
+            cmds = read_config(name, manifest).splitlines()
+            output = net_connect.send_config_set(cmds)
+        return
+
+    if set_files is None:
+        set_files = glob.glob('./output/*.txt')
 
     for sf in set_files:
         with open(sf, "r") as f:
@@ -327,12 +435,19 @@ if __name__ == "__main__":
 
     # Generate configurations
     print(f"\nBuilding configs with target: {OUTPUT_TARGET}")
-    build_config(device_models, target=OUTPUT_TARGET)
+    build_config(device_models, target=OUTPUT_TARGET,
+                 output_format=OUTPUT_FORMAT, compression=OUTPUT_COMPRESSION)
 
     # Optionally push to Panorama
     if OUTPUT_TARGET == "panorama":
         answer = input("Push config to Panorama? [y/n] ")
         if answer == "y":
-            push_config()
+            if PUSH_METHOD == "api":
+                from panorama_api import push_config_api
+                push_config_api(workers=PUSH_CONFIG.get("workers", 8),
+                                verify=PUSH_CONFIG.get("verify", True),
+                                ca_bundle=PUSH_CONFIG.get("ca_bundle"))
+            else:
+                push_config()
     else:
         print("Standalone configs generated. Push manually to each firewall.")
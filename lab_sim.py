@@ -0,0 +1,997 @@
+#!/usr/bin/env python3
+"""
+Offline Lab Simulator for Palo Alto SDWAN Lab
+
+Provides in-process stand-ins for the live infrastructure used by this repo so
+that latency and throughput can be measured without a GNS3 server or a
+Panorama/firewall:
+
+  - FakeGNS3Server: HTTP server implementing the /v2 endpoints GNS3Client
+    (gns3_lab.py) uses: projects, templates, nodes and links.
+  - FakePanosServer: SSH server emulating the PAN-OS CLI closely enough for
+    Netmiko's paloalto_panos driver (operational/configure mode, set commands,
+    commit). Every accepted set command is recorded on the simulated device.
+  - FakePanoramaAPIServer: HTTP server accepting the XML API keygen and
+    config/set requests sent by panorama_api.py.
+
+All three servers accept an injectable per-request/per-command latency (seconds).
+
+Usage:
+    python lab_sim.py gns3 [--port=3080] [--latency=0]   - Run fake GNS3 server
+    python lab_sim.py panos [--port=2222] [--latency=0]  - Run fake PAN-OS SSH server
+    python lab_sim.py api [--port=8443] [--latency=0]    - Run fake Panorama XML API (http)
+    python lab_sim.py bench [--latency=0] [--requests=200] [--workers=8]
+                                                         - Benchmark gns3_lab.py, and the
+                                                           SSH vs XML API Panorama push
+    python lab_sim.py bench-verify [--devices=50] [--workers=32] [--latency=0]
+                                                         - Benchmark verify.py against a
+                                                           synthetic hub-and-spoke fleet
+    python lab_sim.py check-xml                          - Regression check of the
+                                                           panorama_api.py XML converter
+"""
+
+import re
+import sys
+import json
+import time
+import uuid
+import socket
+import threading
+import xml.etree.ElementTree as ET
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import paramiko
+
+from utils import load_build_config, get_option
+
+
+# =============================================================================
+# Fake GNS3 server
+# =============================================================================
+
+# Default templates served by the fake GNS3 server, matching model-sdwan.yaml
+DEFAULT_TEMPLATES = {
+    "PA-VM 11.1.13": {"template_type": "qemu", "adapters": 8},
+    "Cisco Router [8000v]": {"template_type": "qemu", "adapters": 8},
+    "Ethernet switch": {"template_type": "ethernet_switch", "adapters": 0},
+    "Cloud": {"template_type": "cloud", "adapters": 0},
+}
+
+
+class GNS3State:
+    """In-memory GNS3 controller state (projects, templates, nodes, links)"""
+
+    def __init__(self, templates=None):
+        self.lock = threading.Lock()
+        self.projects = {}
+        self.nodes = {}
+        self.links = {}
+        self.templates = {}
+        self.request_count = 0
+        for name, data in (templates or DEFAULT_TEMPLATES).items():
+            template_id = str(uuid.uuid4())
+            self.templates[template_id] = {
+                "template_id": template_id,
+                "name": name,
+                "template_type": data["template_type"],
+                "adapters": data.get("adapters", 0),
+            }
+
+    @staticmethod
+    def _ports_for_adapters(adapters):
+        return [
+            {"adapter_number": a, "port_number": 0, "name": f"Ethernet{a}", "short_name": f"e{a}"}
+            for a in range(adapters)
+        ]
+
+    @staticmethod
+    def _ports_from_mapping(ports_mapping):
+        return [
+            {"adapter_number": 0, "port_number": p["port_number"], "name": p["name"], "short_name": p["name"]}
+            for p in ports_mapping
+        ]
+
+    def add_node(self, project_id, name, node_type, x, y, ports, properties=None):
+        node_id = str(uuid.uuid4())
+        node = {
+            "node_id": node_id,
+            "project_id": project_id,
+            "name": name,
+            "node_type": node_type,
+            "compute_id": "local",
+            "x": x,
+            "y": y,
+            "status": "stopped",
+            "ports": ports,
+            "properties": properties or {},
+        }
+        self.nodes[node_id] = node
+        return node
+
+
+class GNS3RequestHandler(BaseHTTPRequestHandler):
+    """Routes /v2 requests to the GNS3State attached to the server"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        # Keep benchmark output readable
+        pass
+
+    def _send(self, status, body=None):
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _dispatch(self, method):
+        state = self.server.state
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        if not parts or parts[0] != "v2":
+            return self._send(404, {"message": f"Unknown path {self.path}"})
+        parts = parts[1:]
+        body = self._read_json() if method in ("POST", "PUT") else {}
+
+        with state.lock:
+            state.request_count += 1
+            status, result = self._route(state, method, parts, body)
+        self._send(status, result)
+
+    def _route(self, state, method, parts, body):
+        if parts == ["templates"] and method == "GET":
+            return 200, list(state.templates.values())
+
+        if parts == ["projects"]:
+            if method == "GET":
+                return 200, list(state.projects.values())
+            if method == "POST":
+                if any(p["name"] == body.get("name") for p in state.projects.values()):
+                    return 409, {"message": f"Project '{body.get('name')}' already exists"}
+                project_id = str(uuid.uuid4())
+                state.projects[project_id] = {
+                    "project_id": project_id,
+                    "name": body["name"],
+                    "status": "opened",
+                }
+                return 201, state.projects[project_id]
+
+        if len(parts) < 2 or parts[0] != "projects":
+            return 404, {"message": "Not found"}
+
+        project_id = parts[1]
+        project = state.projects.get(project_id)
+        if project is None:
+            return 404, {"message": f"Project {project_id} not found"}
+        rest = parts[2:]
+
+        if not rest:
+            if method == "GET":
+                return 200, project
+            if method == "DELETE":
+                del state.projects[project_id]
+                state.nodes = {k: v for k, v in state.nodes.items() if v["project_id"] != project_id}
+                state.links = {k: v for k, v in state.links.items() if v["project_id"] != project_id}
+                return 204, None
+
+        if rest == ["open"] and method == "POST":
+            project["status"] = "opened"
+            return 201, project
+
+        if rest == ["nodes"]:
+            if method == "GET":
+                return 200, [n for n in state.nodes.values() if n["project_id"] == project_id]
+            if method == "POST":
+                properties = body.get("properties", {})
+                ports = self._builtin_ports(state, properties)
+                node = state.add_node(project_id, body["name"], body["node_type"],
+                                      body.get("x", 0), body.get("y", 0), ports, properties)
+                return 201, node
+
+        if len(rest) == 2 and rest[0] == "templates" and method == "POST":
+            template = state.templates.get(rest[1])
+            if template is None:
+                return 404, {"message": f"Template {rest[1]} not found"}
+            ports = state._ports_for_adapters(template["adapters"])
+            node = state.add_node(project_id, body["name"], template["template_type"],
+                                  body.get("x", 0), body.get("y", 0), ports)
+            return 201, node
+
+        if len(rest) == 3 and rest[0] == "nodes" and rest[2] in ("start", "stop") and method == "POST":
+            node = state.nodes.get(rest[1])
+            if node is None or node["project_id"] != project_id:
+                return 404, {"message": f"Node {rest[1]} not found"}
+            node["status"] = "started" if rest[2] == "start" else "stopped"
+            return 200, node
+
+        if rest == ["links"]:
+            if method == "GET":
+                return 200, [l for l in state.links.values() if l["project_id"] == project_id]
+            if method == "POST":
+                return self._create_link(state, project_id, body)
+
+        return 404, {"message": "Not found"}
+
+    @staticmethod
+    def _builtin_ports(state, properties):
+        if "ports_mapping" in properties:
+            return state._ports_from_mapping(properties["ports_mapping"])
+        return []
+
+    @staticmethod
+    def _create_link(state, project_id, body):
+        endpoints = body.get("nodes", [])
+        if len(endpoints) != 2:
+            return 400, {"message": "A link requires exactly two nodes"}
+
+        used = {
+            (n["node_id"], n["adapter_number"], n["port_number"])
+            for l in state.links.values() if l["project_id"] == project_id
+            for n in l["nodes"]
+        }
+        for ep in endpoints:
+            node = state.nodes.get(ep.get("node_id"))
+            if node is None or node["project_id"] != project_id:
+                return 404, {"message": f"Node {ep.get('node_id')} not found"}
+            if not any(p["adapter_number"] == ep["adapter_number"] and p["port_number"] == ep["port_number"]
+                       for p in node["ports"]):
+                return 409, {"message": f"Port {ep['adapter_number']}/{ep['port_number']} "
+                                        f"does not exist on {node['name']}"}
+            if (ep["node_id"], ep["adapter_number"], ep["port_number"]) in used:
+                return 409, {"message": f"Port {ep['adapter_number']}/{ep['port_number']} "
+                                        f"is already used on {node['name']}"}
+
+        link_id = str(uuid.uuid4())
+        state.links[link_id] = {"link_id": link_id, "project_id": project_id, "nodes": endpoints}
+        return 201, state.links[link_id]
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+class FakeGNS3Server:
+    """Threaded fake GNS3 controller, usable with GNS3Client("127.0.0.1", server.port)"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, templates=None):
+        self.httpd = ThreadingHTTPServer((host, port), GNS3RequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = GNS3State(templates)
+        self.httpd.latency = latency
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    @property
+    def state(self):
+        return self.httpd.state
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# =============================================================================
+# Fake PAN-OS SSH/CLI
+# =============================================================================
+
+class FakePanosDevice:
+    """
+    Simulated PAN-OS CLI state shared by all SSH sessions to one server.
+
+    Set commands entered in configure mode are appended to `candidate`;
+    `commit` moves them to `running`. Operational commands (show vpn ike-sa,
+    show vpn flow, show interface all, ping) report every IKE gateway and
+    tunnel found in the config as up, except gateways in `down_gateways`.
+    """
+
+    def __init__(self, hostname="PA-VM", latency=0.0):
+        self.hostname = hostname
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.candidate = []
+        self.running = []
+        self.commits = 0
+        self.commands_received = 0
+        self.down_gateways = set()
+        self._state_cache = (None, None)
+
+    def tunnel_state(self):
+        """IKE gateways and tunnel interfaces parsed from the running + candidate config"""
+        lines = self.running + self.candidate
+        key = (len(self.running), len(self.candidate))
+        if self._state_cache[0] == key:
+            return self._state_cache[1]
+
+        state = {"gateways": {}, "tunnels": {}, "ipsec": {}}
+        for line in lines:
+            match = re.search(r"network ike gateway (\S+) peer-address ip (\S+)", line)
+            if match:
+                state["gateways"].setdefault(match.group(1), {})["peer_ip"] = match.group(2)
+            match = re.search(r"network ike gateway (\S+) local-address interface \S+ ip (\S+)", line)
+            if match:
+                state["gateways"].setdefault(match.group(1), {})["local_ip"] = match.group(2).split("/")[0]
+            match = re.search(r"network interface tunnel units (\S+) ip (\S+)", line)
+            if match:
+                state["tunnels"][match.group(1)] = match.group(2)
+            match = re.search(r"network tunnel ipsec (\S+) tunnel-interface (\S+)", line)
+            if match:
+                state["ipsec"][match.group(1)] = match.group(2)
+        self._state_cache = (key, state)
+        return state
+
+    def show_vpn_ike_sa(self):
+        gateways = self.tunnel_state()["gateways"]
+        lines = [
+            "IKEv2 SAs",
+            f"{'Gateway ID':<16}{'Peer-Address':<23}{'Gateway Name':<32}Role SN   "
+            f"{'Algorithm':<22}{'Established':<16}{'Expiration':<16}Xt Child ST",
+            f"{'----------':<16}{'------------':<23}{'------------':<32}---- --   "
+            f"{'---------':<22}{'-----------':<16}{'----------':<16}-- ----- --",
+        ]
+        for i, (name, gw) in enumerate(gateways.items(), 1):
+            if name in self.down_gateways:
+                continue
+            peer = f"{gw.get('peer_ip', '0.0.0.0')} [500]"
+            lines.append(f"{i:<16}{peer:<23}{name:<32}Init {i:<4} {'PSK/DH14/A128/SHA256':<22}"
+                         f"{'Jan.01 00:00:00':<16}{'Jan.01 08:00:00':<16}0  1     Established")
+        return "\r\n".join(lines)
+
+    def show_interface_all(self):
+        tunnels = self.tunnel_state()["tunnels"]
+        lines = [
+            f"total configured logical interfaces: {len(tunnels)}",
+            "",
+            f"{'name':<20}{'id':<6}vsys {'zone':<17}{'forwarding':<25}{'tag':<7}address",
+            f"{'-' * 19:<20}{'-' * 5:<6}---- {'-' * 16:<17}{'-' * 24:<25}{'-' * 6:<7}{'-' * 18}",
+        ]
+        for i, (intf, ip) in enumerate(tunnels.items(), 256):
+            lines.append(f"{intf:<20}{i:<6}1    {'zone-sdwan':<17}{'vr:default':<25}{0:<7}{ip}")
+        return "\r\n".join(lines)
+
+    def show_vpn_flow(self):
+        state = self.tunnel_state()
+        lines = [
+            f"total IPSec tunnel configured: {len(state['ipsec'])}",
+            "",
+            f"{'id':<8}{'name':<32}{'state':<8}{'monitor':<8}{'local-ip':<20}{'peer-ip':<20}tunnel-i/f",
+            "-" * 106,
+        ]
+        for i, (name, intf) in enumerate(state["ipsec"].items(), 1):
+            gw = state["gateways"].get(name, {})
+            up = name not in self.down_gateways
+            lines.append(f"{i:<8}{name:<32}{'active' if up else 'init':<8}{'up' if up else 'down':<8}"
+                         f"{gw.get('local_ip', '0.0.0.0'):<20}{gw.get('peer_ip', '0.0.0.0'):<20}{intf}")
+        return "\r\n".join(lines)
+
+    def ping(self, cmd):
+        state = self.tunnel_state()
+        source = re.search(r"source (\S+)", cmd)
+        host = re.search(r"host (\S+)", cmd)
+        host = host.group(1) if host else "0.0.0.0"
+        received = 2
+        if source:
+            intfs = [i for i, ip in state["tunnels"].items() if ip.split("/")[0] == source.group(1)]
+            names = [n for n, i in state["ipsec"].items() if i in intfs]
+            if not intfs or any(n in self.down_gateways for n in names):
+                received = 0
+        return (f"PING {host} ({host}) 56(84) bytes of data.\r\n\r\n"
+                f"--- {host} ping statistics ---\r\n"
+                f"2 packets transmitted, {received} received, {100 - received * 50}% packet loss")
+
+    def prompt(self, username, config_mode):
+        if config_mode:
+            return f"[edit]\r\n{username}@{self.hostname}# "
+        return f"{username}@{self.hostname}> "
+
+    def run_command(self, line, config_mode):
+        """
+        Execute one CLI line.
+
+        Returns (output, config_mode, close) where close signals the session
+        should end.
+        """
+        cmd = line.strip()
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.commands_received += 1
+
+        if not cmd:
+            return "", config_mode, False
+
+        if config_mode:
+            if cmd in ("exit", "quit"):
+                return "Exiting configuration mode", False, False
+            if cmd.startswith("set ") or cmd.startswith("delete "):
+                with self.lock:
+                    self.candidate.append(cmd)
+                return "", True, False
+            if cmd.startswith("commit"):
+                with self.lock:
+                    self.running.extend(self.candidate)
+                    self.candidate = []
+                    self.commits += 1
+                    job = self.commits
+                return (f"Commit job {job} is in progress. Use Ctrl+C to return to command prompt\r\n"
+                        f"...100%\r\nConfiguration committed successfully"), True, False
+            return "Invalid syntax.", True, False
+
+        if cmd == "configure":
+            return "Entering configuration mode", True, False
+        if cmd in ("exit", "quit"):
+            return "", False, True
+        if cmd.startswith("set cli"):
+            return "", False, False
+        if cmd == "show system info":
+            return (f"hostname: {self.hostname}\r\nip-address: 127.0.0.1\r\n"
+                    f"model: PA-VM\r\nsw-version: 11.1.13\r\noperational-mode: normal"), False, False
+        if cmd == "show admins":
+            return ("Admin          From                  Client Session-start        Idle-for\r\n"
+                    "--------------------------------------------------------------------------\r\n"
+                    "admin          127.0.0.1             CLI    01/01 00:00:00       00:00:00s"), False, False
+        if cmd == "show vpn ike-sa":
+            return self.show_vpn_ike_sa(), False, False
+        if cmd == "show vpn flow":
+            return self.show_vpn_flow(), False, False
+        if cmd == "show interface all":
+            return self.show_interface_all(), False, False
+        if cmd.startswith("ping "):
+            return self.ping(cmd), False, False
+        return f"Unknown command: {cmd.split()[0]}", False, False
+
+
+class _PanosSSHInterface(paramiko.ServerInterface):
+    """Accepts any credentials; supports the keyboard-interactive auth Netmiko uses for PAN-OS"""
+
+    def __init__(self):
+        self.shell_requested = threading.Event()
+        self.username = "admin"
+
+    def get_allowed_auths(self, username):
+        return "keyboard-interactive,password"
+
+    def check_auth_password(self, username, password):
+        self.username = username
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_auth_interactive(self, username, submethods):
+        self.username = username
+        query = paramiko.InteractiveQuery()
+        query.add_prompt("Password: ", False)
+        return query
+
+    def check_auth_interactive_response(self, responses):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        self.shell_requested.set()
+        return True
+
+
+class FakePanosServer:
+    """Threaded fake PAN-OS SSH endpoint, usable with Netmiko's paloalto_panos driver"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, hostname="PA-VM", host_key=None):
+        self.device = FakePanosDevice(hostname=hostname, latency=latency)
+        # Key generation is slow; share one key when running many servers
+        self.host_key = host_key or paramiko.RSAKey.generate(2048)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.running = False
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.sock.getsockname()[1]
+
+    def start(self):
+        self.sock.listen(100)
+        self.running = True
+        self.thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.sock.close()
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                break
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._handle_client, args=(client,), daemon=True).start()
+
+    def _handle_client(self, client):
+        transport = paramiko.Transport(client)
+        transport.add_server_key(self.host_key)
+        iface = _PanosSSHInterface()
+        try:
+            transport.start_server(server=iface)
+            chan = transport.accept(20)
+            if chan is None or not iface.shell_requested.wait(10):
+                return
+            self._serve_shell(chan, iface.username)
+        except (paramiko.SSHException, EOFError, OSError):
+            pass
+        finally:
+            transport.close()
+
+    def _serve_shell(self, chan, username):
+        device = self.device
+        config_mode = False
+        buf = ""
+
+        chan.sendall(f"Welcome {username}.\r\n\r\n{device.prompt(username, config_mode)}")
+        while True:
+            data = chan.recv(65536)
+            if not data:
+                return
+            buf += data.decode(errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
+            while "\n" in buf:
+                line, buf = buf.split("\n", 1)
+                output, config_mode, close = device.run_command(line, config_mode)
+                # Echo the command back like a terminal, then its output and prompt
+                reply = line + "\r\n"
+                if output:
+                    reply += output + "\r\n"
+                if close:
+                    chan.sendall(reply)
+                    chan.close()
+                    return
+                chan.sendall(reply + device.prompt(username, config_mode))
+
+
+# =============================================================================
+# Fake Panorama XML API
+# =============================================================================
+
+class PanoramaAPIRequestHandler(BaseHTTPRequestHandler):
+    """Handles /api/ keygen and config/set requests against an in-memory store"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, message, result=""):
+        payload = (f'<response status="{status}"><msg>{message}</msg>'
+                   f'{result}</response>').encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _params(self):
+        query = self.path.split("?", 1)[1] if "?" in self.path else ""
+        params = {k: v[0] for k, v in parse_qs(query).items()}
+        length = int(self.headers.get("Content-Length", 0))
+        if length:
+            body = self.rfile.read(length).decode()
+            params.update({k: v[0] for k, v in parse_qs(body).items()})
+        return params
+
+    def _dispatch(self):
+        params = self._params()
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if not self.path.startswith("/api"):
+            return self._send("error", f"Unknown path {self.path}")
+
+        with self.server.lock:
+            self.server.request_count += 1
+
+        if params.get("type") == "keygen":
+            return self._send("success", "", f"<result><key>{self.server.api_key}</key></result>")
+        if params.get("key") != self.server.api_key:
+            return self._send("error", "Invalid credentials.")
+
+        if params.get("type") == "config" and params.get("action") == "set":
+            try:
+                element = ET.fromstring(params["element"])
+            except (KeyError, ET.ParseError) as e:
+                return self._send("error", f"Malformed element: {e}")
+            with self.server.lock:
+                self.server.config[(params.get("xpath"), element.get("name"))] = element
+                self.server.elements_loaded += sum(1 for _ in element.iter())
+            return self._send("success", "command succeeded")
+
+        return self._send("error", f"Unsupported request type {params.get('type')}")
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+
+class FakePanoramaAPIServer:
+    """Threaded fake PAN-OS XML API, usable with panorama_api.PanoramaAPIClient(scheme="http")"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        self.httpd = ThreadingHTTPServer((host, port), PanoramaAPIRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.lock = threading.Lock()
+        self.httpd.api_key = "LUFRPT1mYWtlLWxhYi1zaW0ta2V5"
+        self.httpd.config = {}
+        self.httpd.request_count = 0
+        self.httpd.elements_loaded = 0
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# =============================================================================
+# Benchmarks
+# =============================================================================
+
+def bench_gns3(latency, requests_count):
+    """Drive gns3_lab.py against the fake GNS3 server and report timings"""
+    import gns3_lab
+
+    server = FakeGNS3Server(latency=latency).start()
+    config = {"gns3": {
+        "server": "127.0.0.1",
+        "port": server.port,
+        "project_name": "bench-palo-sdwan-lab",
+        "templates": {"paloalto": "PA-VM 11.1.13", "c8000v": "Cisco Router [8000v]"},
+    }}
+
+    print(f"\n=== GNS3 benchmark (latency={latency}s) ===")
+    start = time.perf_counter()
+    gns3_lab.create_lab(config)
+    elapsed = time.perf_counter() - start
+    project_id = next(iter(server.state.projects))
+    print(f"\ncreate_lab: {elapsed:.3f}s, {server.state.request_count} requests, "
+          f"{len(server.state.nodes)} nodes, {len(server.state.links)} links "
+          f"(includes create_lab's fixed 2s settle delay)")
+
+    for name, func in (("start_lab", gns3_lab.start_lab), ("stop_lab", gns3_lab.stop_lab)):
+        before = server.state.request_count
+        start = time.perf_counter()
+        func(config)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {elapsed:.3f}s, {server.state.request_count - before} requests")
+
+    client = gns3_lab.GNS3Client("127.0.0.1", server.port)
+    start = time.perf_counter()
+    for _ in range(requests_count):
+        client.get_nodes(project_id)
+    elapsed = time.perf_counter() - start
+    print(f"get_nodes x{requests_count}: {elapsed:.3f}s ({requests_count / elapsed:.1f} req/s)")
+
+    server.stop()
+
+
+def bench_push(latency, workers=8):
+    """
+    Push the Panorama configs listed in output/manifest.json over SSH (push_config)
+    and the XML API (push_config_api), each against its fake endpoint, and compare timings
+    """
+    import panorama_api
+    from artifacts import load_manifest, read_config
+
+    manifest = load_manifest(target="panorama")
+    if not manifest:
+        print("\nSkipping push benchmark: run build-config.py with target: panorama first")
+        return
+
+    build_config = load_build_config()
+    line_count = sum(1 for name in manifest["devices"]
+                     for line in read_config(name, manifest).splitlines() if line.startswith("set "))
+
+    print(f"\n=== Panorama push benchmark: {len(manifest['devices'])} devices ({manifest['format']}, "
+          f"{manifest['compression']}), {line_count} set commands (latency={latency}s) ===")
+
+    server = FakePanosServer(latency=latency).start()
+    start = time.perf_counter()
+    build_config.push_config(host="127.0.0.1", password="admin", port=server.port)
+    ssh_elapsed = time.perf_counter() - start
+    ssh_count = len(server.device.candidate)
+    server.stop()
+
+    server = FakePanoramaAPIServer(latency=latency).start()
+    start = time.perf_counter()
+    panorama_api.push_config_api(host="127.0.0.1", password="admin", port=server.port,
+                                 workers=workers, scheme="http")
+    api_elapsed = time.perf_counter() - start
+    api_requests = server.httpd.request_count
+    server.stop()
+
+    print(f"\nssh push: {ssh_elapsed:.3f}s, {ssh_count} set commands accepted "
+          f"({ssh_count / ssh_elapsed:.1f} cmds/s)")
+    print(f"api push: {api_elapsed:.3f}s, {api_requests} requests, {workers} workers "
+          f"({line_count / api_elapsed:.1f} cmds/s)")
+    print(f"speedup:  {ssh_elapsed / api_elapsed:.1f}x")
+
+
+# Rendered pa-set.j2 lines (hub1 in model-sdwan.yaml) and the XML panorama_api.py must build
+# from them: layer3 ip / tunnel units ip entries, sdwan units interface and zone layer3
+# member lists, and leaf values for static-route / local-address interface
+XML_CHECK_LINES = [
+    "set template hub1 config network interface ethernet ethernet1/1 layer3 ip 192.168.11.2/24 sdwan-gateway 192.168.11.1",
+    "set template hub1 config network interface ethernet ethernet1/1 layer3 sdwan-link-settings sdwan-interface-profile ISP1",
+    "set template hub1 config network interface ethernet ethernet1/1 layer3 interface-management-profile ping-only",
+    "set template hub1 config network interface tunnel units tunnel.200 ip 100.64.2.0/31",
+    "set template hub1 config network interface sdwan units sdwan.102 interface [ tunnel.200 ]",
+    "set template hub1 config network interface sdwan units sdwan.102 interface [ tunnel.201 ]",
+    "set template hub1 config vsys vsys1 zone zone-to-branch network layer3 [ tunnel.200 ]",
+    "set template hub1 config network ike gateway palo2_isp1_isp1 local-address interface ethernet1/1 ip 192.168.11.2/24",
+    "set template hub1 config network virtual-router default routing-table ip static-route palo2_loopback destination 10.2.100.1/32 interface sdwan.102",
+    "set template-stack hub1_stack templates hub1",
+    "set template-stack hub1_stack templates global_settings",
+]
+
+XML_CHECK_EXPECTED = [
+    ("template", """
+<entry name="hub1"><config><devices><entry name="localhost.localdomain">
+  <network>
+    <interface>
+      <ethernet><entry name="ethernet1/1"><layer3>
+        <ip><entry name="192.168.11.2/24"><sdwan-gateway>192.168.11.1</sdwan-gateway></entry></ip>
+        <sdwan-link-settings><sdwan-interface-profile>ISP1</sdwan-interface-profile></sdwan-link-settings>
+        <interface-management-profile>ping-only</interface-management-profile>
+      </layer3></entry></ethernet>
+      <tunnel><units><entry name="tunnel.200"><ip><entry name="100.64.2.0/31"/></ip></entry></units></tunnel>
+      <sdwan><units><entry name="sdwan.102">
+        <interface><member>tunnel.200</member><member>tunnel.201</member></interface>
+      </entry></units></sdwan>
+    </interface>
+    <ike><gateway><entry name="palo2_isp1_isp1">
+      <local-address><interface>ethernet1/1</interface><ip>192.168.11.2/24</ip></local-address>
+    </entry></gateway></ike>
+    <virtual-router><entry name="default"><routing-table><ip><static-route>
+      <entry name="palo2_loopback"><destination>10.2.100.1/32</destination><interface>sdwan.102</interface></entry>
+    </static-route></ip></routing-table></entry></virtual-router>
+  </network>
+  <vsys><entry name="vsys1"><zone><entry name="zone-to-branch">
+    <network><layer3><member>tunnel.200</member></layer3></network>
+  </entry></zone></entry></vsys>
+</entry></devices></config></entry>
+"""),
+    ("template-stack", """
+<entry name="hub1_stack"><templates><member>hub1</member><member>global_settings</member></templates></entry>
+"""),
+]
+
+
+def check_xml():
+    """
+    Regression check for the panorama_api.py set -> XML converter: convert the
+    XML_CHECK_LINES fixture and compare with XML_CHECK_EXPECTED, then convert the
+    full pa-set.j2 output for every device in model-sdwan.yaml.
+    Returns True if everything matches.
+    """
+    import panorama_api
+    from jinja2 import Environment, FileSystemLoader
+
+    def canonical(xml):
+        return ET.canonicalize(xml, strip_text=True)
+
+    ok = True
+    payloads = panorama_api.set_commands_to_xml(XML_CHECK_LINES)
+    if len(payloads) != len(XML_CHECK_EXPECTED):
+        print(f"FAIL: expected {len(XML_CHECK_EXPECTED)} elements, got {len(payloads)}")
+        ok = False
+    for (xpath, _, element, _), (kind, expected) in zip(payloads, XML_CHECK_EXPECTED):
+        if xpath != f"{panorama_api.DEVICE_XPATH}/{kind}" or canonical(element) != canonical(expected):
+            print(f"FAIL: {kind} element differs\n  expected: {canonical(expected)}\n  actual:   {canonical(element)}")
+            ok = False
+
+    build_config = load_build_config()
+    device_models = build_config.build_device_models(build_config.model)
+    template = Environment(loader=FileSystemLoader("./")).get_template("pa-set.j2")
+    rendered = {name: template.render(vars=data) for name, data in device_models.items()}
+
+    # Keep the fixture honest: its lines must still be what pa-set.j2 renders
+    if "hub1" in rendered:
+        hub_lines = {line.strip() for line in rendered["hub1"].splitlines()}
+        for line in XML_CHECK_LINES:
+            if line not in hub_lines:
+                print(f"FAIL: fixture line no longer rendered by pa-set.j2: {line}")
+                ok = False
+
+    for name, text in rendered.items():
+        try:
+            payloads = panorama_api.set_commands_to_xml(text.splitlines())
+        except ValueError as e:
+            print(f"FAIL: {name}: {e}")
+            ok = False
+            continue
+        kinds = sorted(xpath.rsplit("/", 1)[1] for xpath, _, _, _ in payloads)
+        if kinds != ["template", "template-stack"]:
+            print(f"FAIL: {name}: expected one template and one template-stack, got {kinds}")
+            ok = False
+
+    print(f"XML converter check: {'ok' if ok else 'FAILED'} ({len(rendered)} devices converted)")
+    return ok
+
+
+def synthetic_model(device_count, base_model):
+    """
+    Build a hub-and-spoke model with one hub and device_count - 1 branches,
+    each with isp1/isp2/lan1, reusing profiles/tunnels from base_model
+    """
+    members = {}
+    for device_id in range(1, device_count + 1):
+        name = "hub1" if device_id == 1 else f"palo{device_id}"
+        members[name] = {
+            "sn": f"0079540000{device_id:05d}",
+            "role": "hub" if device_id == 1 else "branch",
+            "id": device_id,
+            "template": name,
+            "router_id": f"10.{device_id}.100.1",
+            "interfaces": {
+                "isp1": {"name": "ethernet1/1", "address": f"172.16.{device_id}.2/24",
+                         "sdwan_gw": f"172.16.{device_id}.1"},
+                "isp2": {"name": "ethernet1/2", "address": f"172.17.{device_id}.2/24",
+                         "sdwan_gw": f"172.17.{device_id}.1", "l3": True},
+                "lan1": {"name": "ethernet1/4", "address": f"10.{device_id}.10.1/24"},
+            },
+        }
+    return {
+        "target": "standalone",
+        "members": members,
+        "tunnels": base_model.get("tunnels", {}),
+        "profiles": base_model.get("profiles", {}),
+    }
+
+
+def bench_verify(latency, device_count, workers):
+    """Run verify.py against device_count fake firewalls preloaded with their rendered configs"""
+    import verify
+    from jinja2 import Environment, FileSystemLoader
+
+    build_config = load_build_config()
+    model = synthetic_model(device_count, build_config.model)
+    device_models = build_config.build_device_models(model)
+    template = Environment(loader=FileSystemLoader("./")).get_template("pa-standalone.j2")
+
+    print(f"\n=== Verify benchmark: {device_count} firewalls, {workers} workers (latency={latency}s) ===")
+    host_key = paramiko.RSAKey.generate(2048)
+    servers = {}
+    for name, data in device_models.items():
+        server = FakePanosServer(latency=latency, hostname=name, host_key=host_key).start()
+        config = template.render(vars=data)
+        server.device.running = [line.strip() for line in config.splitlines() if line.startswith("set ")]
+        servers[name] = server
+
+    # Take one branch tunnel down so the matrix has something to report
+    last = list(device_models)[-1]
+    down = next(iter(device_models[last]["remotes"]["hub1"]["tunnels"]))
+    servers[last].device.down_gateways.add(down)
+
+    targets = {name: ("127.0.0.1", server.port) for name, server in servers.items()}
+    start = time.perf_counter()
+    results = verify.verify_deployment(device_models, targets, "admin", "admin", workers=workers)
+    elapsed = time.perf_counter() - start
+
+    serial = sum(r["elapsed"] for r in results.values())
+    tunnels = sum(len(r["rows"]) for r in results.values())
+    failed = [(name, row["gateway"]) for name, r in results.items() for row in r["rows"] if not row["ok"]]
+    errors = [name for name, r in results.items() if r["error"]]
+    print(f"verify: {elapsed:.2f}s wall for {len(results)} devices / {tunnels} tunnel checks "
+          f"(sum of per-device time {serial:.2f}s, {serial / elapsed:.1f}x concurrency)")
+    print(f"failed tunnel checks: {failed} (expected [('{last}', '{down}')]), unreachable: {errors}")
+
+    for server in servers.values():
+        server.stop()
+
+
+def run_gns3():
+    server = FakeGNS3Server(port=get_option("port", 3080), latency=get_option("latency", 0.0))
+    print(f"Fake GNS3 server listening on http://127.0.0.1:{server.port}/v2")
+    server.httpd.serve_forever()
+
+
+def run_panos():
+    server = FakePanosServer(port=get_option("port", 2222), latency=get_option("latency", 0.0)).start()
+    print(f"Fake PAN-OS SSH server listening on 127.0.0.1:{server.port} (any username/password)")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+def run_api():
+    server = FakePanoramaAPIServer(port=get_option("port", 8443), latency=get_option("latency", 0.0))
+    print(f"Fake Panorama XML API listening on http://127.0.0.1:{server.port}/api/ (any username/password)")
+    server.httpd.serve_forever()
+
+
+def run_bench():
+    latency = get_option("latency", 0.0)
+    bench_gns3(latency, get_option("requests", 200))
+    bench_push(latency, workers=get_option("workers", 8))
+
+
+def run_check_xml():
+    if not check_xml():
+        sys.exit(1)
+
+
+def run_bench_verify():
+    bench_verify(get_option("latency", 0.0), get_option("devices", 50), get_option("workers", 32))
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    command = sys.argv[1].lower()
+
+    commands = {
+        "gns3": run_gns3,
+        "panos": run_panos,
+        "api": run_api,
+        "bench": run_bench,
+        "bench-verify": run_bench_verify,
+        "check-xml": run_check_xml,
+    }
+
+    if command not in commands:
+        print(f"Unknown command: {command}")
+        print("Available commands: gns3, panos, api, bench, bench-verify, check-xml")
+        sys.exit(1)
+
+    commands[command]()
+
+
+if __name__ == "__main__":
+    main()
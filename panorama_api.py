@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Panorama XML API Bulk Push
+
+Alternative to the line-by-line Netmiko SSH push in build-config.py. The
+rendered Panorama set commands (output/panorama-set.txt) are converted into
+one XML element per template / template-stack and loaded with a single
+`type=config&action=set` request each, sent in parallel over a pooled HTTPS
+session. Templates are loaded before template-stacks since stacks reference
+them.
+
+The converter understands the command vocabulary produced by pa-set.j2; it is
+not a general PAN-OS schema.
+
+Usage:
+    python panorama_api.py [set-file ...] [--workers=8] [--ca-bundle=ca.pem] [--no-verify]
+        Push set files (default: devices in a Panorama output/manifest.json).
+        workers / ca-bundle / verify default to the push: block in model-sdwan.yaml.
+"""
+
+import sys
+import shlex
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from getpass import getpass
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from artifacts import load_manifest, read_config
+from utils import load_build_config, get_option
+
+
+DEVICE_XPATH = "/config/devices/entry[@name='localhost.localdomain']"
+
+# Keywords whose next token names an <entry> in a list
+ENTRY_LISTS = {
+    "template", "template-stack", "vsys", "devices",
+    "sdwan-interface-profile", "interface-management-profile", "monitor-profile",
+    "ethernet", "units", "zone", "virtual-router", "static-route",
+    "gateway", "ipsec", "ike-gateway",
+    "redist-profile", "redist-rules", "peer-group", "peer", "rules", "tag",
+}
+
+# Keywords that only open a container, never take a value
+CONTAINERS = {
+    "config", "settings", "network", "profiles", "loopback", "tunnel", "sdwan",
+    "sdwan-link-settings", "ike", "import", "routing-table", "protocol", "bgp",
+    "policy", "aggregation", "rulebase", "security", "nat", "authentication",
+    "pre-shared-key", "local-address", "peer-address", "auto-key",
+    "tunnel-monitor", "source-translation", "dynamic-ip-and-port",
+    "interface-address", "filter", "nexthop", "layer3",
+}
+
+# (parent context, keyword) pairs whose values are <member> lists
+MEMBER_LISTS = {
+    ("template-stack", "templates"),
+    ("virtual-router", "interface"),
+    ("units", "interface"),
+    ("import/network", "interface"),
+    ("zone/network", "layer3"),
+    ("filter", "type"),
+    ("filter", "interface"),
+    ("rules", "from"),
+    ("rules", "to"),
+    ("rules", "source"),
+    ("rules", "destination"),
+    ("rules", "application"),
+    ("rules", "service"),
+}
+
+# (parent context, keyword) pairs that override the defaults above
+CONTEXT_ENTRIES = {("layer3", "ip"), ("units", "ip"), ("aggregation", "address")}
+CONTEXT_CONTAINERS = {("routing-table", "ip"), ("routing-table", "ipv6"), ("network", "interface"), ("redist-profile", "action")}
+CONTEXT_LEAVES = {
+    ("layer3", "interface-management-profile"),
+    ("units", "interface-management-profile"),
+    ("sdwan-link-settings", "sdwan-interface-profile"),
+}
+
+
+def _context_matches(context, parent):
+    parent = parent.split("/")
+    return context[-len(parent):] == parent
+
+
+def _classify(context, token):
+    """Return 'entry', 'member', 'container' or 'leaf' for token under context"""
+    for parent, keyword in MEMBER_LISTS:
+        if token == keyword and _context_matches(context, parent):
+            return "member"
+    for parent, keyword in CONTEXT_LEAVES:
+        if token == keyword and _context_matches(context, parent):
+            return "leaf"
+    for parent, keyword in CONTEXT_ENTRIES:
+        if token == keyword and _context_matches(context, parent):
+            return "entry"
+    for parent, keyword in CONTEXT_CONTAINERS:
+        if token == keyword and _context_matches(context, parent):
+            return "container"
+    if token == "interface":
+        # local-address interface X, static-route ... interface X
+        return "leaf"
+    if token in ENTRY_LISTS:
+        return "entry"
+    if token in CONTAINERS:
+        return "container"
+    return "leaf"
+
+
+def _child(node, tag):
+    child = node.find(tag)
+    if child is None:
+        child = ET.SubElement(node, tag)
+    return child
+
+
+def _entry(node, name):
+    for entry in node.findall("entry"):
+        if entry.get("name") == name:
+            return entry
+    return ET.SubElement(node, "entry", name=name)
+
+
+def _add_members(node, values):
+    existing = {m.text for m in node.findall("member")}
+    for value in values:
+        if value not in existing:
+            ET.SubElement(node, "member").text = value
+            existing.add(value)
+
+
+def apply_set_command(root, line):
+    """
+    Merge one `set ...` CLI line into the XML tree rooted at root
+    (the device entry, i.e. DEVICE_XPATH).
+    """
+    tokens = shlex.split(line)
+    if not tokens or tokens[0] != "set":
+        return
+    tokens = tokens[1:]
+
+    node = root
+    context = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        kind = _classify(context, token)
+        has_value = i + 1 < len(tokens)
+
+        if kind == "entry" and has_value:
+            node = _entry(_child(node, token), tokens[i + 1])
+            context.append(token)
+            i += 2
+            # Panorama templates hold a full device config under config/devices
+            if token == "template" and i < len(tokens) and tokens[i] == "config":
+                node = _entry(_child(_child(node, "config"), "devices"), "localhost.localdomain")
+                context.append("config")
+                i += 1
+        elif kind == "member" and has_value:
+            if tokens[i + 1] == "[":
+                end = tokens.index("]", i + 2)
+                values = tokens[i + 2:end]
+            else:
+                end = i + 1
+                values = [tokens[i + 1]]
+            _add_members(_child(node, token), values)
+            i = end + 1
+        elif kind == "container" or not has_value:
+            node = _child(node, token)
+            context.append(token)
+            i += 1
+        else:
+            _child(node, token).text = tokens[i + 1]
+            i += 2
+
+
+def set_commands_to_xml(lines):
+    """
+    Convert set commands into per-template XML elements.
+
+    Returns a list of (xpath, name, element_xml, line_count) tuples, templates
+    first then template-stacks, where xpath is the parent the element is set
+    under and name is the template / template-stack name.
+    """
+    root = ET.Element("entry", name="localhost.localdomain")
+    counts = {}
+
+    for line in lines:
+        line = line.strip()
+        if not line.startswith("set "):
+            continue
+        parts = line.split(None, 3)
+        if len(parts) < 3 or parts[1] not in ("template", "template-stack"):
+            raise ValueError(f"API push only supports Panorama template commands: {line}")
+        key = (parts[1], parts[2].strip('"'))
+        counts[key] = counts.get(key, 0) + 1
+        apply_set_command(root, line)
+
+    payloads = []
+    for kind in ("template", "template-stack"):
+        container = root.find(kind)
+        if container is None:
+            continue
+        for entry in container.findall("entry"):
+            name = entry.get("name")
+            xml = ET.tostring(entry, encoding="unicode")
+            payloads.append((f"{DEVICE_XPATH}/{kind}", name, xml, counts.get((kind, name), 0)))
+    return payloads
+
+
+class PanoramaAPIClient:
+    """Minimal PAN-OS XML API client with a pooled, thread-safe session"""
+
+    def __init__(self, host, api_key=None, port=443, scheme="https", verify=True, pool_size=8):
+        """verify: True (system CAs), a CA bundle path, or False to skip certificate checks"""
+        self.base_url = f"{scheme}://{host}:{port}/api/"
+        self.api_key = api_key
+        self.verify = verify
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _request(self, params):
+        if self.api_key and "key" not in params:
+            params = dict(params, key=self.api_key)
+        resp = self.session.post(self.base_url, data=params, verify=self.verify)
+        resp.raise_for_status()
+        result = ET.fromstring(resp.text)
+        if result.get("status") != "success":
+            msg = " ".join(t.strip() for t in result.itertext() if t.strip())
+            raise RuntimeError(f"PAN-OS API error: {msg or resp.text}")
+        return result
+
+    def keygen(self, username, password):
+        result = self._request({"type": "keygen", "user": username, "password": password})
+        self.api_key = result.findtext("./result/key")
+        return self.api_key
+
+    def config_set(self, xpath, element):
+        return self._request({"type": "config", "action": "set", "xpath": xpath, "element": element})
+
+
+def push_config_api(host=None, password=None, port=443, set_files=None, workers=8,
+                    username="admin", scheme="https", verify=True, ca_bundle=None):
+    """
+    Push rendered Panorama set files via the XML API.
+
+    Each template is loaded with a single config/set request; templates are
+    sent in parallel (up to `workers`), then template-stacks. Reads configs via
+    output/manifest.json when it was built for Panorama and set_files is not
+    given, otherwise output/panorama-set.txt.
+
+    The Panorama certificate is verified against ca_bundle (or the system CAs);
+    verify=False skips the check and urllib3 warns on every request.
+    """
+    if host is None:
+        host = input("Enter your hostname: ")
+    if password is None:
+        password = getpass("Enter password: ")
+    lines = []
+    manifest = load_manifest(target="panorama") if set_files is None else None
+    if manifest:
+        for name in manifest["devices"]:
+            lines.extend(read_config(name, manifest).splitlines())
+    else:
+        for sf in set_files or ["./output/panorama-set.txt"]:
+            with open(sf, "r") as f:
+                lines.extend(f.readlines())
+
+    payloads = set_commands_to_xml(lines)
+    if verify and ca_bundle:
+        verify = ca_bundle
+    client = PanoramaAPIClient(host, port=port, scheme=scheme, verify=verify, pool_size=workers)
+    client.keygen(username, password)
+
+    def load(payload):
+        xpath, name, element, line_count = payload
+        start = time.perf_counter()
+        client.config_set(xpath, element)
+        return (f"  Loaded {xpath.rsplit('/', 1)[1]} {name}: {line_count} lines "
+                f"in {time.perf_counter() - start:.3f}s")
+
+    templates = [p for p in payloads if p[0].endswith("/template")]
+    stacks = [p for p in payloads if p[0].endswith("/template-stack")]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Stacks reference templates, so finish templates first
+        for batch in (templates, stacks):
+            for line in pool.map(load, batch):
+                print(line)
+
+    return payloads
+
+
+def main():
+    # Defaults from the model's push: block, overridable on the command line
+    push = load_build_config().PUSH_CONFIG
+    set_files = [a for a in sys.argv[1:] if not a.startswith("--")]
+    verify = push.get("verify", True) and "--no-verify" not in sys.argv
+    push_config_api(set_files=set_files or None,
+                    workers=get_option("workers", int(push.get("workers", 8))),
+                    verify=verify,
+                    ca_bundle=get_option("ca-bundle", push.get("ca_bundle") or "") or None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+SDWAN Render Service
+
+Long-running alternative to re-launching build-config.py for every change.
+Keeps the parsed model, tunnel mesh, device models and compiled Jinja
+templates in memory, watches model-sdwan.yaml and the .j2 templates for
+changes, and serves renders over a local HTTP API (TCP or Unix socket).
+
+Rendered configs are cached per device and target; after a reload only
+devices whose device model (or template) changed are re-rendered.
+
+API:
+    GET  /health                      - Model load time, device count, cache size
+    GET  /devices                     - Device names
+    GET  /render/<device>[?target=]   - Rendered config for one device (text)
+    POST /render-changed[?target=]    - Re-render changed devices and write output/
+    GET  /tunnels                     - Tunnel mesh summary (text)
+    POST /reload                      - Force reload of model and templates
+
+Usage:
+    python render_service.py [--port=8765] [--socket=/path/to.sock] [--interval=1.0]
+
+Example:
+    curl http://127.0.0.1:8765/render/hub1
+    curl --unix-socket /tmp/sdwan.sock http://localhost/render/hub1
+"""
+
+import os
+import glob
+import json
+import time
+import hashlib
+import threading
+import traceback
+import socketserver
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import yaml
+from jinja2 import Environment, FileSystemLoader
+
+from artifacts import write_outputs, load_manifest, describe
+from utils import load_build_config, get_option
+
+
+MODEL_FILE = "model-sdwan.yaml"
+TEMPLATES = {"panorama": "pa-set.j2", "standalone": "pa-standalone.j2"}
+
+
+def fingerprint(data):
+    """Stable hash of a device model, used to detect per-device changes"""
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class UnknownDevice(LookupError):
+    """Requested device is not in the loaded model"""
+
+
+class RenderService:
+    """In-memory model, device models and compiled templates with a render cache"""
+
+    def __init__(self, build_config):
+        self.build_config = build_config
+        self.lock = threading.RLock()
+        self.write_lock = threading.Lock()
+        self.env = Environment(loader=FileSystemLoader("./"))
+        self.model = None
+        self.tunnel_mesh = None
+        self.device_models = {}
+        self.fingerprints = {}
+        self.templates = {}
+        self.template_version = 0
+        self.cache = {}      # (device, target) -> (fingerprint, template_version, text)
+        self.mtimes = {}     # path -> mtime of the last successfully loaded version
+        self.failed = {}     # path -> mtime of a version that failed to load
+        self.reload_lock = threading.Lock()
+        self.loaded_at = None
+
+    def watched_files(self):
+        return [MODEL_FILE] + sorted(glob.glob("*.j2"))
+
+    def compile_templates(self):
+        """Compile all templates in a fresh environment (nothing is swapped in)"""
+        env = Environment(loader=FileSystemLoader("./"))
+        return env, {t: env.get_template(name) for t, name in TEMPLATES.items()}
+
+    def parse_model(self):
+        """Load the model and build device models (nothing is swapped in)"""
+        with open(MODEL_FILE, "r") as f:
+            model = yaml.safe_load(f)
+        tunnel_mesh = self.build_config.generate_tunnel_mesh(model)
+        device_models = self.build_config.build_device_models(model, tunnel_mesh=tunnel_mesh)
+        fingerprints = {name: fingerprint(data) for name, data in device_models.items()}
+        return model, tunnel_mesh, device_models, fingerprints
+
+    def _apply_templates(self, compiled):
+        with self.lock:
+            self.env, self.templates = compiled
+            self.template_version += 1
+
+    def _apply_model(self, parsed):
+        """Swap in parse_model() output; returns changed device names"""
+        model, tunnel_mesh, device_models, fingerprints = parsed
+        with self.lock:
+            changed = [n for n, fp in fingerprints.items() if self.fingerprints.get(n) != fp]
+            self.model = model
+            self.tunnel_mesh = tunnel_mesh
+            self.device_models = device_models
+            self.fingerprints = fingerprints
+            self.cache = {k: v for k, v in self.cache.items() if k[0] in device_models}
+            self.loaded_at = time.time()
+        return changed
+
+    def load_templates(self):
+        self._apply_templates(self.compile_templates())
+
+    def load_model(self):
+        """(Re)load the model and rebuild device models; returns changed device names"""
+        return self._apply_model(self.parse_model())
+
+    def reload(self):
+        """
+        Reload model and templates. Both are parsed first and swapped in together,
+        so a broken file raises and leaves the previous state serving.
+        """
+        with self.reload_lock:
+            mtimes = self._current_mtimes()
+            compiled = self.compile_templates()
+            parsed = self.parse_model()
+            with self.lock:
+                self._apply_templates(compiled)
+                changed = self._apply_model(parsed)
+            self.mtimes = mtimes
+            self.failed = {}
+        return changed
+
+    def _current_mtimes(self):
+        mtimes = {}
+        for path in self.watched_files():
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+        return mtimes
+
+    def _reload_files(self, paths, mtimes, load, describe):
+        """
+        Run load() for changed paths. Their mtimes are only recorded once load()
+        succeeds, so a failed file is retried on every check until it loads.
+        """
+        try:
+            result = load()
+        except Exception as e:
+            # Keep serving the last good state; report each failed version once
+            if any(self.failed.get(p) != mtimes.get(p) for p in paths):
+                print(f"Reload of {', '.join(paths)} failed, keeping previous state: {e}")
+            self.failed.update({p: mtimes.get(p) for p in paths})
+            return
+        for p in paths:
+            self.failed.pop(p, None)
+            if p in mtimes:
+                self.mtimes[p] = mtimes[p]
+            else:
+                self.mtimes.pop(p, None)
+        print(describe(result))
+
+    def check_for_changes(self):
+        """Reload whatever changed on disk since the last successful load"""
+        with self.reload_lock:
+            mtimes = self._current_mtimes()
+            changed_files = sorted(p for p in set(mtimes) | set(self.mtimes)
+                                   if mtimes.get(p) != self.mtimes.get(p))
+            templates = [p for p in changed_files if p.endswith(".j2")]
+
+            if templates:
+                self._reload_files(templates, mtimes, self.load_templates,
+                                   lambda _: f"Templates reloaded: {', '.join(templates)}")
+            if MODEL_FILE in changed_files:
+                self._reload_files([MODEL_FILE], mtimes, self.load_model,
+                                   lambda changed: f"Model reloaded: {len(changed)} device(s) changed {changed}")
+
+    def watch(self, interval=1.0):
+        while True:
+            time.sleep(interval)
+            self.check_for_changes()
+
+    def target(self, target=None):
+        return target or self.model.get("target", "panorama")
+
+    def render(self, name, target=None):
+        """Render one device, using the cache when its model and template are unchanged"""
+        with self.lock:
+            target = self.target(target)
+            if name not in self.device_models:
+                raise UnknownDevice(name)
+            if target not in self.templates:
+                raise ValueError(f"Unknown target '{target}'")
+            fp = self.fingerprints[name]
+            version = self.template_version
+            cached = self.cache.get((name, target))
+            if cached and cached[0] == fp and cached[1] == version:
+                return cached[2]
+            data = self.device_models[name]
+            template = self.templates[target]
+
+        text = template.render(vars=data)
+        with self.lock:
+            self.cache[(name, target)] = (fp, version, text)
+        return text
+
+    def render_changed(self, target=None):
+        """
+        Re-render devices whose model or template changed and write the
+        output files and manifest build_config() would produce for the target.
+        `changed` lists devices whose config differs from the manifest on disk.
+        """
+        with self.lock:
+            target = self.target(target)
+            names = list(self.device_models)
+            options = self.model.get("output", {}) or {}
+
+        rendered = {name: self.render(name, target) for name in names}
+
+        # One writer at a time: overlapping requests would interleave output files and manifest
+        with self.write_lock:
+            previous = load_manifest()
+            if not previous or previous.get("target") != target:
+                previous = {"devices": {}}
+            changed = [n for n in names if previous["devices"].get(n, {}).get("sha256")
+                       != describe(rendered[n])["sha256"]]
+            written = write_outputs(rendered, target, options.get("format", "files"),
+                                    options.get("compression", "none"))
+        return {"target": target, "changed": changed, "written": written}
+
+    def tunnel_summary(self):
+        with self.lock:
+            return self.build_config.format_tunnel_summary(self.model, self.tunnel_mesh)
+
+    def health(self):
+        with self.lock:
+            return {
+                "loaded_at": self.loaded_at,
+                "devices": len(self.device_models),
+                "target": self.target(),
+                "cached_renders": len(self.cache),
+                "template_version": self.template_version,
+            }
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """Routes API requests to the RenderService attached to the server"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json", elapsed=None):
+        if content_type == "application/json":
+            body = json.dumps(body, indent=2)
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        if elapsed is not None:
+            self.send_header("X-Render-Time-ms", f"{elapsed * 1000:.3f}")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _dispatch(self, method):
+        service = self.server.service
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        target = parse_qs(url.query).get("target", [None])[0]
+        start = time.perf_counter()
+
+        try:
+            if method == "GET" and parts == ["health"]:
+                return self._send(200, service.health())
+            if method == "GET" and parts == ["devices"]:
+                return self._send(200, sorted(service.device_models))
+            if method == "GET" and len(parts) == 2 and parts[0] == "render":
+                text = service.render(parts[1], target)
+                return self._send(200, text, "text/plain", time.perf_counter() - start)
+            if method == "POST" and parts == ["render-changed"]:
+                result = service.render_changed(target)
+                return self._send(200, result, elapsed=time.perf_counter() - start)
+            if method == "GET" and parts == ["tunnels"]:
+                return self._send(200, service.tunnel_summary(), "text/plain")
+            if method == "POST" and parts == ["reload"]:
+                try:
+                    changed = service.reload()
+                except Exception as e:
+                    return self._send(500, {"error": f"Reload failed, keeping previous state: {e}"})
+                return self._send(200, {"changed": changed})
+        except UnknownDevice as e:
+            return self._send(404, {"error": f"Unknown device '{e.args[0]}'"})
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        except Exception as e:
+            traceback.print_exc()
+            return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+        return self._send(404, {"error": f"Unknown endpoint {method} {url.path}"})
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+
+class UnixRenderRequestHandler(RenderRequestHandler):
+    """RenderRequestHandler for Unix sockets (no TCP options, no client address)"""
+
+    disable_nagle_algorithm = False
+
+    def address_string(self):
+        return "unix"
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(service, port=8765, socket_path=None, interval=1.0):
+    """Start the file watcher and serve the API until interrupted"""
+    threading.Thread(target=service.watch, args=(interval,), daemon=True).start()
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        httpd = ThreadingUnixHTTPServer(socket_path, UnixRenderRequestHandler)
+        print(f"Render service listening on unix socket {socket_path}")
+    else:
+        httpd = ThreadingHTTPServer(("127.0.0.1", port), RenderRequestHandler)
+        httpd.daemon_threads = True
+        print(f"Render service listening on http://127.0.0.1:{port}")
+    httpd.service = service
+
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main():
+    start = time.perf_counter()
+    service = RenderService(load_build_config())
+    service.reload()
+    print(f"Loaded {len(service.device_models)} devices and templates in "
+          f"{(time.perf_counter() - start) * 1000:.1f}ms")
+
+    serve(service, port=get_option("port", 8765), socket_path=get_option("socket", "") or None,
+          interval=get_option("interval", 1.0))
+
+
+if __name__ == "__main__":
+    main()
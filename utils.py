@@ -0,0 +1,22 @@
+"""
+Shared helpers for the scripts built around build-config.py
+"""
+
+import sys
+import importlib.util
+
+
+def load_build_config():
+    """Import build-config.py as a module (the hyphen keeps a plain import from working)"""
+    spec = importlib.util.spec_from_file_location("build_config", "build-config.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def get_option(name, default):
+    """Read a --name=value option from sys.argv, converted to the type of default"""
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return type(default)(arg.split("=", 1)[1])
+    return default
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Post-Deploy SDWAN Verification
+
+Derives the expected IKE gateways, tunnel.N interfaces and tunnel monitor IPs
+for every firewall from the device models built by build-config.py, collects
+operational state from all firewalls concurrently over SSH and prints an
+expected-vs-actual matrix.
+
+Per firewall (one SSH session, run in parallel across firewalls):
+  - show vpn ike-sa      -> IKE gateway established?
+  - show interface all   -> tunnel.N present with expected address?
+  - show vpn flow        -> IPSec tunnel active and tunnel monitor (ping of
+                            the monitor IP) up?
+  - ping (with --ping)   -> explicit ping of each monitor IP from the tunnel IP
+
+Firewall management addresses come from the optional `mgmt_ip` / `mgmt_port`
+keys of each member in model-sdwan.yaml (default: member name, port 22).
+
+Usage:
+    python verify.py [device ...] [--workers=32] [--ping] [--failures-only]
+"""
+
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from getpass import getpass
+
+from netmiko import ConnectHandler
+
+from utils import load_build_config, get_option
+
+
+def expected_tunnels(device_models):
+    """
+    Expected tunnel state per device from build_device_models() output.
+
+    Returns dict of device name -> list of tunnel dicts
+    (remote, gateway, intf, ip, monitor_ip, peer_ip)
+    """
+    expected = {}
+    for name, device in device_models.items():
+        rows = []
+        for remote, remote_data in device["remotes"].items():
+            for gateway, t in remote_data["tunnels"].items():
+                rows.append({
+                    "remote": remote,
+                    "gateway": gateway,
+                    "intf": t["intf"],
+                    "ip": t["ip"],
+                    "monitor_ip": t["monitor_ip"],
+                    "peer_ip": t["peer_ip"],
+                })
+        expected[name] = rows
+    return expected
+
+
+def get_targets(model, devices=None):
+    """Management (host, port) for each member, optionally limited to devices"""
+    targets = {}
+    for name, member in model["members"].items():
+        if devices and name not in devices:
+            continue
+        targets[name] = (member.get("mgmt_ip", name), member.get("mgmt_port", 22))
+    return targets
+
+
+def parse_ike_sa(output):
+    """Map gateway name -> state from `show vpn ike-sa`"""
+    sas = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) < 3 or not fields[0].isdigit():
+            continue
+        # Gateway ID, Peer-Address, [port], Gateway Name, ... State (last column)
+        name = fields[3] if fields[2].startswith("[") else fields[2]
+        sas[name] = fields[-1]
+    return sas
+
+
+def parse_interfaces(output):
+    """Map tunnel interface name -> address from `show interface all`"""
+    interfaces = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if fields and re.match(r"^tunnel\.\d+$", fields[0]):
+            interfaces[fields[0]] = fields[-1] if "/" in fields[-1] else ""
+    return interfaces
+
+
+def parse_vpn_flow(output):
+    """Map tunnel name -> {state, monitor, intf} from `show vpn flow`"""
+    flows = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) >= 7 and fields[0].isdigit():
+            flows[fields[1]] = {"state": fields[2], "monitor": fields[3], "intf": fields[6]}
+    return flows
+
+
+def parse_ping(output):
+    """True if `ping` received at least one reply"""
+    match = re.search(r"(\d+) (?:packets )?received", output)
+    return bool(match and int(match.group(1)) > 0)
+
+
+def collect_state(host, port, username, password, tunnels, ping=False):
+    """Collect operational state from one firewall over a single SSH session"""
+    device = {
+        "device_type": "paloalto_panos",
+        "host": host,
+        "port": port,
+        "username": username,
+        "password": password,
+    }
+    conn = ConnectHandler(**device)
+    try:
+        state = {
+            "ike": parse_ike_sa(conn.send_command("show vpn ike-sa")),
+            "interfaces": parse_interfaces(conn.send_command("show interface all")),
+            "flows": parse_vpn_flow(conn.send_command("show vpn flow")),
+            "ping": {},
+        }
+        if ping:
+            for t in tunnels:
+                source = t["ip"].split("/")[0]
+                output = conn.send_command(f"ping count 2 source {source} host {t['monitor_ip']}")
+                state["ping"][t["monitor_ip"]] = parse_ping(output)
+    finally:
+        conn.disconnect()
+    return state
+
+
+def compare(tunnels, state, ping=False):
+    """Build expected-vs-actual rows for one device"""
+    rows = []
+    for t in tunnels:
+        ike = state["ike"].get(t["gateway"], "missing")
+        intf_ip = state["interfaces"].get(t["intf"])
+        flow = state["flows"].get(t["gateway"], {})
+        checks = {
+            "ike": ike,
+            "intf": "ok" if intf_ip == t["ip"] else ("missing" if intf_ip is None else f"ip {intf_ip}"),
+            "tunnel": flow.get("state", "missing"),
+            "monitor": flow.get("monitor", "missing"),
+        }
+        ok = (checks["ike"] == "Established" and checks["intf"] == "ok"
+              and checks["tunnel"] == "active" and checks["monitor"] == "up")
+        if ping:
+            checks["ping"] = "ok" if state["ping"].get(t["monitor_ip"]) else "fail"
+            ok = ok and checks["ping"] == "ok"
+        rows.append(dict(t, checks=checks, ok=ok))
+    return rows
+
+
+def verify_deployment(device_models, targets, username, password, workers=32, ping=False):
+    """
+    Verify all target devices concurrently.
+
+    Returns dict of device name -> {"rows": [...], "error": str or None, "elapsed": s}
+    """
+    expected = expected_tunnels(device_models)
+
+    def verify_device(name):
+        host, port = targets[name]
+        start = time.perf_counter()
+        try:
+            state = collect_state(host, port, username, password, expected[name], ping=ping)
+            rows, error = compare(expected[name], state, ping=ping), None
+        except Exception as e:
+            rows = [dict(t, checks={}, ok=False) for t in expected[name]]
+            error = str(e).splitlines()[0] if str(e) else type(e).__name__
+        return name, {"rows": rows, "error": error, "elapsed": time.perf_counter() - start}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(verify_device, sorted(targets)))
+
+
+def print_matrix(results, ping=False, failures_only=False):
+    """Print the expected-vs-actual matrix and a summary line"""
+    columns = ["ike", "intf", "tunnel", "monitor"] + (["ping"] if ping else [])
+    header = f"{'device':<12} {'gateway':<28} {'interface':<12} {'monitor ip':<16} " + \
+             " ".join(f"{c:<12}" for c in columns)
+    print(header)
+    print("-" * len(header))
+
+    total = failed = 0
+    for name, result in results.items():
+        if result["error"]:
+            print(f"{name:<12} ERROR: {result['error']}")
+        for row in result["rows"]:
+            total += 1
+            failed += not row["ok"]
+            if failures_only and row["ok"]:
+                continue
+            if result["error"]:
+                continue
+            checks = " ".join(f"{row['checks'].get(c, '-'):<12}" for c in columns)
+            print(f"{name:<12} {row['gateway']:<28} {row['intf']:<12} {row['monitor_ip']:<16} {checks}")
+
+    unreachable = sum(1 for r in results.values() if r["error"])
+    print(f"\n{len(results)} devices ({unreachable} unreachable), "
+          f"{total} tunnels: {total - failed} ok, {failed} failed")
+    return failed == 0
+
+
+def main():
+    build_config = load_build_config()
+    model = build_config.model
+    devices = [a for a in sys.argv[1:] if not a.startswith("--")]
+    ping = "--ping" in sys.argv
+    failures_only = "--failures-only" in sys.argv
+
+    unknown = [d for d in devices if d not in model["members"]]
+    if unknown:
+        print(f"Unknown device(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    device_models = build_config.build_device_models(model)
+    targets = get_targets(model, devices)
+
+    password = getpass("Enter password: ")
+    start = time.perf_counter()
+    results = verify_deployment(device_models, targets, "admin", password,
+                                workers=get_option("workers", 32), ping=ping)
+    print(f"Collected state from {len(targets)} devices in {time.perf_counter() - start:.2f}s\n")
+
+    if not print_matrix(results, ping=ping, failures_only=failures_only):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()